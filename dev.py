@@ -10,9 +10,12 @@
 import argparse
 import dataclasses
 import fcntl
+import functools
 import hashlib
 import json
 import os
+import select
+import shlex
 import shutil
 import signal
 import subprocess
@@ -23,12 +26,17 @@ from pathlib import Path
 
 
 ROOT = Path(__file__).parent.resolve()
+# Worktree identity: keys the dev DB, lock file and port block. ROOT is fixed
+# for the life of the process, so hash it once. Stays MD5 on purpose: a new
+# algorithm would move every existing worktree to a fresh DB and port pair.
+_ROOT_DIGEST = hashlib.md5(str(ROOT).encode(), usedforsecurity=False).hexdigest()
 
 UI_DIR = ROOT / "ui"
 PHOENIX_PID_FILE = ROOT / ".phoenix.pid"
 VITE_PID_FILE = ROOT / ".vite.pid"
 VITE_PROXY_FILE = ROOT / ".vite.proxy"
 LOG_FILE = ROOT / "phoenix.log"
+LOG_MAX_BYTES = 10 * 1024 * 1024
 
 
 def _node_env() -> dict:
@@ -40,10 +48,10 @@ def _node_env() -> dict:
     is found (safe: the check will simply use whatever `node` is on PATH).
     """
     env = os.environ.copy()
-    node_version_file = ROOT / ".node-version"
-    if not node_version_file.exists():
+    try:
+        requested = (ROOT / ".node-version").read_text().strip()  # e.g. "22" or "22.14"
+    except FileNotFoundError:
         return env
-    requested = node_version_file.read_text().strip()  # e.g. "22" or "22.14"
     major = requested.split(".")[0]
     candidates = [
         Path.home() / "node",
@@ -138,24 +146,67 @@ def _gateway_is_reachable(url: str) -> bool:
 def _discover_gateway_candidates() -> list[str]:
     """Build an ordered list of gateway URLs to try."""
     candidates = [LOCAL_AI_PROXY]
-    if EXE_DEV_CONFIG.exists():
-        try:
-            config = json.loads(EXE_DEV_CONFIG.read_text())
-            if gw := config.get("llm_gateway"):
-                candidates.append(gw)
-        except (json.JSONDecodeError, KeyError):
-            pass
+    try:
+        config = json.loads(EXE_DEV_CONFIG.read_text())
+        if gw := config.get("llm_gateway"):
+            candidates.append(gw)
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        pass
     candidates.append(DEFAULT_GATEWAY)
     return candidates
 
 
-def write_deployed_sha():
-    """Write the current HEAD SHA to ~/.phoenix-ide/deployed.sha."""
-    result = subprocess.run(
+def _read_git_head(root: Path) -> str | None:
+    """Resolve HEAD to a full SHA by reading the git dir directly.
+
+    Handles linked worktrees (`.git` file -> gitdir, `commondir` for shared
+    refs) and packed refs. Returns None for anything else (e.g. reftable),
+    so the caller can fall back to git itself.
+    """
+    git_dir = root / ".git"
+    if git_dir.is_file():
+        content = git_dir.read_text().strip()
+        if not content.startswith("gitdir: "):
+            return None
+        git_dir = (root / content.removeprefix("gitdir: ")).resolve()
+    head = (git_dir / "HEAD").read_text().strip()
+    if not head.startswith("ref: "):
+        return head or None
+    ref = head.removeprefix("ref: ")
+    common_dir = git_dir
+    if (git_dir / "commondir").exists():
+        common_dir = (git_dir / (git_dir / "commondir").read_text().strip()).resolve()
+    for base in (git_dir, common_dir):
+        try:
+            return (base / ref).read_text().strip()
+        except FileNotFoundError:
+            pass
+    try:
+        for line in (common_dir / "packed-refs").read_text().splitlines():
+            if line.endswith(f" {ref}"):
+                return line.split(" ", 1)[0]
+    except FileNotFoundError:
+        pass
+    return None
+
+
+@functools.cache
+def _git_head() -> str:
+    """Full SHA of HEAD in ROOT ("" if unresolvable). Cached per process."""
+    try:
+        if sha := _read_git_head(ROOT):
+            return sha
+    except OSError:
+        pass
+    return subprocess.run(
         ["git", "rev-parse", "HEAD"],
         cwd=ROOT, capture_output=True, text=True,
-    )
-    sha = result.stdout.strip()
+    ).stdout.strip()
+
+
+def write_deployed_sha():
+    """Write the current HEAD SHA to ~/.phoenix-ide/deployed.sha."""
+    sha = _git_head()
     if sha:
         PROD_SHA_PATH.parent.mkdir(parents=True, exist_ok=True)
         PROD_SHA_PATH.write_text(sha + "\n")
@@ -163,39 +214,76 @@ def write_deployed_sha():
 
 def read_deployed_sha() -> str | None:
     """Read the deployed SHA, return short hash with staleness hint or None."""
-    if not PROD_SHA_PATH.exists():
+    try:
+        deployed = PROD_SHA_PATH.read_text().strip()
+    except FileNotFoundError:
         return None
-    deployed = PROD_SHA_PATH.read_text().strip()
     if not deployed:
         return None
     short = deployed[:7]
-    current = subprocess.run(
-        ["git", "rev-parse", "HEAD"],
-        cwd=ROOT, capture_output=True, text=True,
-    ).stdout.strip()
+    current = _git_head()
     if current and current != deployed:
         return f"{short} (HEAD is now {current[:7]})"
     return f"{short} (current)"
 
 
-def get_llm_gateway() -> str | None:
-    """Get LLM gateway URL from env or by probing candidates. Returns None if none reachable."""
+GATEWAY_CACHE_FILE = DB_DIR / "gateway-cache.json"
+GATEWAY_CACHE_TTL = 300  # seconds
+
+
+@functools.cache
+def _probe_llm_gateway(use_cache: bool = True) -> str | None:
+    """Return the highest-priority reachable gateway candidate.
+
+    A successful probe is remembered in GATEWAY_CACHE_FILE for a few minutes so
+    back-to-back `up`/`restart` runs don't pay for the probes again. The cache
+    key includes the hostname and candidate list, so a changed exe.dev config
+    or a shared home directory never serves another machine's answer.
+    With `use_cache=False` the file isn't consulted (a fresh result is still
+    saved): prod deploys bake the URL into the service config, so they must
+    only ever use one that answers right now.
+    """
+    candidates = _discover_gateway_candidates()
+    key = f"{os.uname().nodename}:{','.join(candidates)}"
+    try:
+        cached = json.loads(GATEWAY_CACHE_FILE.read_text())
+        if use_cache and cached["key"] == key and time.time() - cached["ts"] < GATEWAY_CACHE_TTL:
+            return cached["url"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    # Probe all candidates at once so the worst case is one timeout, not N.
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+        reachable = list(pool.map(_gateway_is_reachable, candidates))
+    url = next((u for u, ok in zip(candidates, reachable) if ok), None)
+    if url is not None:
+        try:
+            GATEWAY_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            GATEWAY_CACHE_FILE.write_text(json.dumps({"key": key, "url": url, "ts": time.time()}))
+        except OSError:
+            pass
+    return url
+
+
+def get_llm_gateway(use_cache: bool = True) -> str | None:
+    """Get LLM gateway URL from env or by probing candidates. Returns None if none reachable.
+
+    Prod deploys pass `use_cache=False` to probe live (see _probe_llm_gateway).
+    """
     if val := os.environ.get("LLM_GATEWAY"):
         return val
-    for url in _discover_gateway_candidates():
-        if _gateway_is_reachable(url):
-            return url
-    return None
+    return _probe_llm_gateway(use_cache)
 
 
 def get_worktree_hash() -> str:
     """Get a short hash of the worktree path for unique identification."""
-    return hashlib.md5(str(ROOT).encode()).hexdigest()[:8]
+    return _ROOT_DIGEST[:8]
 
 
 def get_port_offset() -> int:
     """Get deterministic port offset from worktree path hash."""
-    return int(get_worktree_hash()[:4], 16) % PORT_RANGE
+    return int(_ROOT_DIGEST[:4], 16) % PORT_RANGE
 
 
 def get_default_ports() -> tuple[int, int]:
@@ -248,7 +336,7 @@ class DatabaseLock:
             fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
             # Write PID to lock file for debugging
             os.ftruncate(self.fd, 0)
-            os.write(self.fd, f"{os.getpid()}\n".encode())
+            os.pwrite(self.fd, f"{os.getpid()}\n".encode(), 0)
             return True
         except OSError:
             # Lock is held by another process
@@ -262,11 +350,9 @@ class DatabaseLock:
             fcntl.flock(self.fd, fcntl.LOCK_UN)
             os.close(self.fd)
             self.fd = None
-            # Clean up lock file
-            try:
-                self.lock_path.unlink()
-            except OSError:
-                pass
+            # The lock file is deliberately left in place: flock is held on
+            # the inode, so unlinking it would let a concurrent acquire lock
+            # a fresh file while someone else still holds the old one.
     
     def __enter__(self):
         if not self.acquire():
@@ -285,8 +371,16 @@ class DatabaseLock:
 _db_lock: DatabaseLock | None = None
 
 
+# Servers spawned by this invocation, by PID. For these, Popen.poll() is
+# authoritative: it reaps the child, whereas os.kill(pid, 0) keeps reporting
+# an exited-but-unreaped child (a zombie) as alive.
+_spawned: dict[int, subprocess.Popen] = {}
+
+
 def is_process_running(pid: int) -> bool:
     """Check if a process is running."""
+    if (proc := _spawned.get(pid)) is not None:
+        return proc.poll() is None
     try:
         os.kill(pid, 0)
         return True
@@ -294,17 +388,248 @@ def is_process_running(pid: int) -> bool:
         return False
 
 
-def get_pid(pid_file: Path) -> int | None:
-    """Get PID from file if process is still running."""
-    if not pid_file.exists():
+def _open_pidfd(pid: int) -> int | None:
+    """Open a pidfd for `pid` that can both signal and wait on it (Linux).
+
+    Unlike the PID, the fd keeps referring to the same process even if the
+    PID is reused after it exits. Returns None where pidfds aren't available
+    or the process is already gone; callers close the fd themselves.
+    """
+    if not (hasattr(os, "pidfd_open") and hasattr(signal, "pidfd_send_signal")):
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except OSError:
         return None
-    pid = int(pid_file.read_text().strip())
+
+
+def _pidfd_wait(fd: int, timeout: float) -> bool:
+    """Wait up to `timeout` seconds for a pidfd to become readable (exit)."""
+    poller = select.poll()
+    poller.register(fd, select.POLLIN)
+    return bool(poller.poll(timeout * 1000))
+
+
+def _wait_for_exit(pid: int, timeout: float, pidfd: int | None = None) -> bool:
+    """Wait up to `timeout` seconds for `pid` to exit. Returns True if it did.
+
+    Pass an open `pidfd` (see _open_pidfd) to wait on exactly that process.
+
+    On Linux a pidfd becomes readable the moment the process exits, and on
+    macOS/BSD kqueue delivers NOTE_EXIT, so we wake immediately instead of on
+    the next poll tick. Elsewhere (pre-5.3 kernels, or if either is refused)
+    fall back to polling, starting at 2ms and backing off to 50ms so quick
+    exits are seen quickly without spinning on slow ones.
+    """
+    if pidfd is not None:
+        return _pidfd_wait(pidfd, timeout)
+    if hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass  # ENOSYS etc. -- use the polling fallback
+        else:
+            try:
+                return _pidfd_wait(fd, timeout)
+            finally:
+                os.close(fd)
+    elif hasattr(select, "kqueue"):
+        kq = select.kqueue()
+        try:
+            event = select.kevent(
+                pid, filter=select.KQ_FILTER_PROC,
+                flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                fflags=select.KQ_NOTE_EXIT,
+            )
+            return bool(kq.control([event], 1, timeout))
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass  # use the polling fallback
+        finally:
+            kq.close()
+    deadline = time.monotonic() + timeout
+    delay = 0.002
+    while is_process_running(pid):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+    return True
+
+
+def _port_in_use(port: int) -> bool:
+    """True if something already accepts TCP connections on localhost:`port`.
+
+    Checked before spawning a server: _wait_for_port can't tell our server
+    from whatever else is listening there.
+    """
+    import socket
+
+    try:
+        socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+        return True
+    except OSError:
+        return False
+
+
+def _wait_for_group_exit(pgid: int, timeout: float) -> bool:
+    """Wait up to `timeout` seconds for process group `pgid` to empty.
+
+    There is no fd to wait on for a whole group, so this polls with the same
+    2ms-to-50ms backoff as _wait_for_exit's fallback. Returns True once no
+    member is left.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.002
+    while True:
+        try:
+            os.killpg(pgid, 0)
+        except ProcessLookupError:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+
+
+def _wait_for_port(port: int, proc: subprocess.Popen, timeout: float) -> bool | None:
+    """Wait for `proc` to accept TCP connections on localhost:`port`.
+
+    Returns True once the port accepts, False as soon as `proc` exits, or
+    None if it is still running but not listening when `timeout` expires.
+    Polls with a short, growing backoff so a fast start is noticed in
+    milliseconds rather than after a fixed sleep.
+    """
+    import socket
+
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while True:
+        if proc.poll() is not None:
+            return False
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return True
+        except OSError:
+            pass
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(delay)
+        delay = min(delay * 1.5, 0.2)
+
+
+def _signal_group(pid: int, sig: int, pidfd: int | None = None) -> None:
+    """Signal the process group led by `pid`, or just `pid` if it leads none.
+
+    start_phoenix/start_vite spawn with start_new_session=True, so the pgid
+    is the leader's PID and stays valid after the leader exits -- unlike
+    os.getpgid(pid), which fails exactly when orphaned children remain.
+
+    With a `pidfd`, it's used only to check that the leader is still the
+    process we verified. While it is, its PID (and so the pgid) can't have
+    been reused and the group signal reaches our servers; once it has exited
+    the signal still goes by pgid, to whatever is left in that group.
+    """
+    leader_alive = False
+    if pidfd is not None:
+        try:
+            signal.pidfd_send_signal(pidfd, 0)
+            leader_alive = True
+        except ProcessLookupError:
+            pass  # Leader already exited; its children may remain
+    try:
+        os.killpg(pid, sig)
+    except ProcessLookupError:
+        # No such group: the process doesn't lead one.
+        if leader_alive:
+            signal.pidfd_send_signal(pidfd, sig)
+        elif pidfd is None:
+            os.kill(pid, sig)
+
+
+def _process_cmdline(pid: int) -> str | None:
+    """Return the command line of `pid`, or None if it can't be determined."""
+    if sys.platform == "linux":
+        try:
+            return Path(f"/proc/{pid}/cmdline").read_bytes().replace(b"\0", b" ").decode(errors="replace")
+        except OSError:
+            return None
+    try:
+        result = subprocess.run(
+            ["ps", "-p", str(pid), "-o", "command="],
+            capture_output=True, text=True,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+# Substring expected in the command line of the process behind each PID file.
+# Vite runs under `npm run dev`, which shows up as either "npm run dev" or
+# "node .../npm run dev" depending on whether npm rewrote its process title.
+_PID_FILE_PROCESS_NAMES = {
+    PHOENIX_PID_FILE: "phoenix_ide",
+    VITE_PID_FILE: "npm",
+}
+
+
+def get_pid(pid_file: Path, expected_name: str | None = None) -> int | None:
+    """Get PID from file if process is still running.
+
+    PIDs get recycled (most visibly across reboots), so a live PID alone
+    doesn't mean it's still our server. If the process's command line doesn't
+    mention `expected_name` (defaulting per known PID file), the file is
+    treated as stale.
+    """
+    try:
+        record = json.loads(pid_file.read_text())
+        # Older PID files hold a bare integer rather than a JSON record.
+        pid = int(record["pid"] if isinstance(record, dict) else record)
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError):
+        pid_file.unlink(missing_ok=True)  # Unreadable PID file
+        return None
+    expected_name = expected_name or _PID_FILE_PROCESS_NAMES.get(pid_file)
     if is_process_running(pid):
-        return pid
-    pid_file.unlink()  # Clean up stale PID file
+        cmdline = _process_cmdline(pid) if expected_name else None
+        # If the command line can't be read, trust the PID rather than
+        # orphaning a server we actually started.
+        if cmdline is None or expected_name in cmdline:
+            return pid
+    pid_file.unlink(missing_ok=True)  # Clean up stale PID file
     return None
 
 
+def _write_pid_file(pid_file: Path, pid: int, port: int) -> bool:
+    """Create `pid_file` for a freshly spawned server, failing if it exists.
+
+    The record is written to a private temp file and hard-linked into place,
+    so creation is exclusive (like O_EXCL) and readers never see a partially
+    written file. If another live server already owns the file, returns
+    False; a stale file is cleared by get_pid and the link retried once.
+    """
+    record = {"pid": pid, "started_at": time.time(), "port": port}
+    tmp = pid_file.with_name(f"{pid_file.name}.{pid}.tmp")
+    tmp.write_text(json.dumps(record) + "\n")
+    try:
+        for _ in range(2):
+            try:
+                os.link(tmp, pid_file)
+                return True
+            except FileExistsError:
+                if get_pid(pid_file) is not None:
+                    return False
+        return False
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
 def stop_process(pid_file: Path, name: str) -> bool:
     """Stop a process by PID file. Returns True if was running."""
     global _db_lock
@@ -312,33 +637,32 @@ def stop_process(pid_file: Path, name: str) -> bool:
     pid = get_pid(pid_file)
     if pid is None:
         return False
+    # Pin the process get_pid just verified, so the wait below can't be
+    # fooled by a recycled PID and signals only go out while it's ours.
+    pidfd = _open_pidfd(pid)
     try:
         # Kill the entire process group to catch child workers (e.g., Vite
         # spawns node child processes that survive if only the parent is killed)
-        try:
-            pgid = os.getpgid(pid)
-            os.killpg(pgid, signal.SIGTERM)
-        except (OSError, ProcessLookupError):
-            os.kill(pid, signal.SIGTERM)
-        # Wait briefly for graceful shutdown
-        for _ in range(10):
-            if not is_process_running(pid):
-                break
-            time.sleep(0.1)
-        else:
-            try:
-                pgid = os.getpgid(pid)
-                os.killpg(pgid, signal.SIGKILL)
-            except (OSError, ProcessLookupError):
-                os.kill(pid, signal.SIGKILL)
+        _signal_group(pid, signal.SIGTERM, pidfd)
+        # Wait briefly for graceful shutdown of the leader and then of the
+        # children still handling their SIGTERM (one shared budget); only
+        # what's left after that gets SIGKILL.
+        deadline = time.monotonic() + 1.0
+        exited = _wait_for_exit(pid, 1.0, pidfd)
+        if exited:
+            is_process_running(pid)  # Reaps the leader if we spawned it
+            exited = _wait_for_group_exit(pid, deadline - time.monotonic())
+        if not exited:
+            _signal_group(pid, signal.SIGKILL, pidfd)
         print(f"Stopped {name} (PID {pid})")
     except OSError as e:
         print(f"Could not stop {name}: {e}")
     finally:
-        if pid_file.exists():
-            pid_file.unlink()
-        if name == "Vite" and VITE_PROXY_FILE.exists():
-            VITE_PROXY_FILE.unlink()
+        if pidfd is not None:
+            os.close(pidfd)
+        pid_file.unlink(missing_ok=True)
+        if name == "Vite":
+            VITE_PROXY_FILE.unlink(missing_ok=True)
         # Release database lock if stopping Phoenix
         if name == "Phoenix" and _db_lock is not None:
             _db_lock.release()
@@ -373,7 +697,8 @@ def build_rust(release: bool = True):
     args = ["cargo", "build"]
     if release:
         args.append("--release")
-    print("Building Rust backend...")
+    # Flush so our message lands before cargo's output on the shared stdout.
+    print("Building Rust backend...", flush=True)
     subprocess.run(args, check=True, cwd=ROOT)
 
 
@@ -391,19 +716,37 @@ def maybe_enable_auto_tls(env: dict[str, str], tls: bool) -> bool:
     return tls_enabled_from_env(env)
 
 
-def _probe_phoenix_scheme(port: int) -> str | None:
-    import ssl
-    import urllib.request
+def _local_http_connection(port: int, https: bool, timeout: float):
+    """http.client connection to a local server; TLS is not verified (self-signed dev CA)."""
+    import http.client
+
+    if https:
+        import ssl
+        return http.client.HTTPSConnection(
+            "localhost", port, timeout=timeout, context=ssl._create_unverified_context(),
+        )
+    return http.client.HTTPConnection("localhost", port, timeout=timeout)
+
 
+def _local_http_get(scheme: str, port: int, path: str, timeout: float) -> bytes:
+    """GET `path` from a local server and return the body. Raises on failure or HTTP >= 400."""
+    conn = _local_http_connection(port, scheme == "https", timeout)
+    try:
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        body = resp.read()
+        if resp.status >= 400:
+            raise OSError(f"HTTP {resp.status} from {path}")
+        return body
+    finally:
+        conn.close()
+
+
+def _probe_phoenix_scheme(port: int) -> str | None:
     for scheme in ("https", "http"):
-        context = ssl._create_unverified_context() if scheme == "https" else None
         try:
-            with urllib.request.urlopen(
-                f"{scheme}://localhost:{port}/version",
-                timeout=1,
-                context=context,
-            ):
-                return scheme
+            _local_http_get(scheme, port, "/version", timeout=1)
+            return scheme
         except Exception:
             continue
     return None
@@ -437,13 +780,17 @@ def start_phoenix(port: int, release: bool = True, tls: bool = False) -> bool:
             return phoenix_tls
         print("Restarting Phoenix server for TLS mode change")
         stop_process(PHOENIX_PID_FILE, "Phoenix")
-        time.sleep(0.5)
 
     binary = ROOT / "target" / ("release" if release else "debug") / "phoenix_ide"
     if not binary.exists():
         print(f"Binary not found: {binary}", file=sys.stderr)
         sys.exit(1)
 
+    if _port_in_use(port):
+        print(f"ERROR: Port {port} is already in use by another process.", file=sys.stderr)
+        print(f"  Stop it, or pick another port with --port.", file=sys.stderr)
+        sys.exit(1)
+
     # Acquire database lock
     _db_lock = DatabaseLock()
     if not _db_lock.acquire():
@@ -460,7 +807,14 @@ def start_phoenix(port: int, release: bool = True, tls: bool = False) -> bool:
     if "RUST_LOG" not in env:
         env["RUST_LOG"] = "phoenix_ide=debug,tower_http=debug"
 
-    with open(LOG_FILE, "w") as log:
+    # Append so earlier runs' output survives a restart; once the log passes
+    # LOG_MAX_BYTES, keep the previous one as phoenix.log.1 and start afresh.
+    try:
+        if LOG_FILE.stat().st_size > LOG_MAX_BYTES:
+            LOG_FILE.replace(LOG_FILE.with_name(LOG_FILE.name + ".1"))
+    except FileNotFoundError:
+        pass
+    with open(LOG_FILE, "ab") as log:
         proc = subprocess.Popen(
             [str(binary)],
             env=env,
@@ -468,17 +822,28 @@ def start_phoenix(port: int, release: bool = True, tls: bool = False) -> bool:
             stderr=subprocess.STDOUT,
             start_new_session=True,
         )
-        PHOENIX_PID_FILE.write_text(str(proc.pid))
+    _spawned[proc.pid] = proc
+    if not _write_pid_file(PHOENIX_PID_FILE, proc.pid, port):
+        # Another `./dev.py up` won the race; back out of ours.
+        _signal_group(proc.pid, signal.SIGKILL)
+        _db_lock.release()
+        _db_lock = None
+        print("ERROR: Phoenix was started concurrently by another process.", file=sys.stderr)
+        sys.exit(1)
 
-    # Verify it started
-    time.sleep(0.5)
-    if not is_process_running(proc.pid):
+    # Verify it started: wait until it listens, failing fast if it exits.
+    # A listener that appeared after the check above would also satisfy the
+    # wait while our server dies on EADDRINUSE, so confirm it's still alive.
+    ready = _wait_for_port(port, proc, timeout=10.0)
+    if ready is False or proc.poll() is not None:
         print("Phoenix failed to start. Check phoenix.log", file=sys.stderr)
         PHOENIX_PID_FILE.unlink()
         _db_lock.release()
         _db_lock = None
         sys.exit(1)
 
+    if ready is None:
+        print(f"  Warning: Phoenix is running but not yet listening on port {port}. Check phoenix.log")
     print(f"Started Phoenix server (PID {proc.pid}, port {port})")
     print(f"  Database: {db_path}")
     if phoenix_tls:
@@ -492,13 +857,21 @@ def start_vite(port: int, phoenix_port: int, phoenix_tls: bool = False):
     scheme = "https" if phoenix_tls else "http"
     desired_proxy = f"{scheme}://localhost:{phoenix_port}"
     if get_pid(VITE_PID_FILE):
-        current_proxy = VITE_PROXY_FILE.read_text().strip() if VITE_PROXY_FILE.exists() else ""
+        try:
+            current_proxy = VITE_PROXY_FILE.read_text().strip()
+        except FileNotFoundError:
+            current_proxy = ""
         if current_proxy == desired_proxy:
             print("Vite dev server already running")
             return
         print("Restarting Vite dev server for API proxy change")
         stop_process(VITE_PID_FILE, "Vite")
 
+    if _port_in_use(port):
+        print(f"ERROR: Port {port} is already in use by another process.", file=sys.stderr)
+        print(f"  Stop it, or pick another port with --vite-port.", file=sys.stderr)
+        sys.exit(1)
+
     ensure_ui_deps()
 
     env = node_env()
@@ -508,23 +881,33 @@ def start_vite(port: int, phoenix_port: int, phoenix_tls: bool = False):
         env["VITE_API_SCHEME"] = "https"
         env.setdefault("VITE_API_PROXY_SECURE", "false")
     
-    # Start Vite in background (bind to 0.0.0.0 for external access)
+    # Start Vite in background (bind to 0.0.0.0 for external access).
+    # --strictPort makes a taken port an error instead of Vite quietly moving
+    # to the next free one, which our PID/proxy bookkeeping wouldn't know about.
     proc = subprocess.Popen(
-        ["npm", "run", "dev", "--", "--port", str(port), "--host", "0.0.0.0"],
+        ["npm", "run", "dev", "--", "--port", str(port), "--strictPort", "--host", "0.0.0.0"],
         cwd=UI_DIR,
         env=env,
         stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL,
         start_new_session=True,
     )
-    VITE_PID_FILE.write_text(str(proc.pid))
+    _spawned[proc.pid] = proc
+    if not _write_pid_file(VITE_PID_FILE, proc.pid, port):
+        _signal_group(proc.pid, signal.SIGKILL)
+        print("ERROR: Vite was started concurrently by another process.", file=sys.stderr)
+        sys.exit(1)
 
-    time.sleep(1)
-    if not is_process_running(proc.pid):
+    # As in start_phoenix, a listener that appeared after the port check
+    # would satisfy the wait while Vite exits, so confirm it's still alive.
+    ready = _wait_for_port(port, proc, timeout=10.0)
+    if ready is False or proc.poll() is not None:
         print("Vite failed to start", file=sys.stderr)
         VITE_PID_FILE.unlink()
         sys.exit(1)
 
+    if ready is None:
+        print(f"  Warning: Vite is running but not yet listening on port {port}")
     print(f"Started Vite dev server (PID {proc.pid}, port {port})")
     VITE_PROXY_FILE.write_text(desired_proxy + "\n")
     print(f"  Proxying /api to Phoenix at {desired_proxy}")
@@ -548,10 +931,56 @@ def cmd_up(
     print(f"Worktree: {ROOT}")
     print(f"  Hash: {get_worktree_hash()}, Port offset: +{get_port_offset()}")
     print()
-    
-    build_rust(release=True)
-    phoenix_tls = start_phoenix(port=phoenix_port, tls=tls)
-    start_vite(port=vite_port, phoenix_port=phoenix_port, phoenix_tls=phoenix_tls)
+
+    # Ctrl-C (or a SIGTERM) part-way through startup would otherwise leave a
+    # half-started stack: Phoenix running without Vite, and the DB lock held
+    # until this process dies. Tear down only what this invocation started;
+    # servers that were already up before `up` ran are left alone.
+    def abort_startup(signum, frame):
+        global _db_lock
+        print("\nInterrupted -- stopping servers started by this run", file=sys.stderr)
+        # Go by the spawn registry, not the PID files: a child can be
+        # running before its PID file is written, or after losing the race
+        # to write it.
+        live = [proc for proc in _spawned.values() if proc.poll() is None]
+        for proc in live:
+            try:
+                _signal_group(proc.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + 1.0
+        for proc in live:
+            try:
+                proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                pass
+            if not _wait_for_group_exit(proc.pid, max(0.0, deadline - time.monotonic())):
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                proc.wait()
+        # get_pid drops PID files whose process is gone, i.e. ours; files of
+        # servers that were already running stay.
+        for pid_file in (VITE_PID_FILE, PHOENIX_PID_FILE):
+            get_pid(pid_file)
+        if not VITE_PID_FILE.exists():
+            VITE_PROXY_FILE.unlink(missing_ok=True)
+        if _db_lock is not None:
+            _db_lock.release()
+            _db_lock = None
+        sys.exit(128 + signum)
+
+    prev_handlers = {
+        sig: signal.signal(sig, abort_startup) for sig in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        build_rust(release=True)
+        phoenix_tls = start_phoenix(port=phoenix_port, tls=tls)
+        start_vite(port=vite_port, phoenix_port=phoenix_port, phoenix_tls=phoenix_tls)
+    finally:
+        for sig, handler in prev_handlers.items():
+            signal.signal(sig, handler)
     api_scheme = "https" if phoenix_tls else "http"
     print()
     print(f"Ready! UI: http://localhost:{vite_port}")
@@ -598,33 +1027,71 @@ def cmd_seed(
     scheme: str = "http",
 ) -> None:
     """Populate the dev DB with representative conversations for UI/QA testing."""
-    import urllib.request
-    import urllib.error
+    import http.client
     import uuid as _uuid
     import ssl
+    from concurrent.futures import ThreadPoolExecutor
 
     default_phoenix, _ = get_default_ports()
     port = phoenix_port or default_phoenix
-    api  = f"{scheme}://localhost:{port}/api"
     db   = get_db_path()
+
     ssl_context = ssl._create_unverified_context() if scheme == "https" else None
 
+    # One keep-alive connection per seeding thread: a run issues dozens of
+    # requests (creates + `_wait_done` polls), and opening a fresh socket
+    # (plus a TLS handshake under --https) for each one dominated the cost.
+    # http.client connections aren't thread-safe, hence thread-local.
+    local = threading.local()
+
+    def _conn() -> http.client.HTTPConnection:
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            if ssl_context is not None:
+                conn = http.client.HTTPSConnection("localhost", port, context=ssl_context)
+            else:
+                conn = http.client.HTTPConnection("localhost", port)
+            local.conn = conn
+        return conn
+
     # ------------------------------------------------------------------ helpers
 
+    def _request(method: str, path: str, body: bytes | None, timeout: float) -> dict:
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        conn = _conn()
+        # The timeout applies per request: the connection is shared by quick
+        # GET polls and slower POSTs.
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        for attempt in range(2):
+            try:
+                conn.request(method, f"/api{path}", body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server dropped the idle keep-alive socket before reading
+                # the request; reconnect and retry once.
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            except BaseException:
+                # Anything else (timeout, IncompleteRead, ...) leaves the
+                # connection mid-request; reset it so the next call on this
+                # thread reconnects instead of hitting CannotSendRequest.
+                conn.close()
+                raise
+            if resp.status >= 400:
+                raise RuntimeError(f"{method} /api{path} failed: HTTP {resp.status}")
+            return json.loads(data)
+        raise AssertionError("unreachable")
+
     def _get(path: str) -> dict:
-        with urllib.request.urlopen(f"{api}{path}", timeout=5, context=ssl_context) as r:
-            return json.loads(r.read())
+        return _request("GET", path, None, timeout=5)
 
     def _post(path: str, body: dict | None = None) -> dict:
-        data = json.dumps(body).encode() if body else b"{}"
-        req  = urllib.request.Request(
-            f"{api}{path}",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=20, context=ssl_context) as r:
-            return json.loads(r.read())
+        return _request("POST", path, json.dumps(body).encode() if body else b"{}", timeout=20)
 
     def _wait_done(conv_id: str, timeout: float = 15.0) -> str:
         """Poll until the conversation is no longer actively running.
@@ -706,9 +1173,11 @@ def cmd_seed(
     print("Seeding dev DB with representative conversations...")
 
     # -- Direct mode: three standalone conversations -------------------------
+    # Independent of each other, so create them concurrently rather than
+    # waiting out each mock completion in turn.
     print("  [1/4] Direct standalones")
-    for text in _SEED_DIRECT_STANDALONES:
-        _new_conv(text)
+    with ThreadPoolExecutor(max_workers=len(_SEED_DIRECT_STANDALONES)) as pool:
+        list(pool.map(_new_conv, _SEED_DIRECT_STANDALONES))
 
     # -- Direct mode: 3-member chain -----------------------------------------
     print("  [2/4] Direct chains (3-member + 2-member)")
@@ -953,15 +1422,7 @@ def cmd_down():
     stopped_any = False
     stopped_any |= stop_process(VITE_PID_FILE, "Vite")
     stopped_any |= stop_process(PHOENIX_PID_FILE, "Phoenix")
-    
-    # Clean up lock file if it exists and process is gone
-    lock_path = get_lock_path()
-    if lock_path.exists():
-        try:
-            lock_path.unlink()
-        except OSError:
-            pass
-    
+
     if not stopped_any:
         print("Nothing running")
 
@@ -974,7 +1435,6 @@ def cmd_restart(phoenix_port: int | None = None, tls: bool = False):
 
     build_rust(release=True)
     stop_process(PHOENIX_PID_FILE, "Phoenix")
-    time.sleep(0.5)
     phoenix_tls = start_phoenix(port=phoenix_port, tls=tls)
     api_scheme = "https" if phoenix_tls else "http"
 
@@ -988,6 +1448,34 @@ def cmd_restart(phoenix_port: int | None = None, tls: bool = False):
         print(f"  API: {api_scheme}://localhost:{phoenix_port}")
 
 
+MODELS_CACHE_FILE = DB_DIR / "models-cache.json"
+MODELS_CACHE_TTL = 300  # seconds
+
+
+def _phoenix_models(scheme: str, port: int, pid: int) -> list[str]:
+    """Model names the dev server at `port` reports via /api/models.
+
+    Remembered in MODELS_CACHE_FILE for a few minutes, keyed by worktree and
+    server PID, so repeated `status` runs skip the request and a restarted
+    server is always asked afresh. Raises if the server can't be queried.
+    """
+    key = f"{get_worktree_hash()}:{pid}"
+    try:
+        cached = json.loads(MODELS_CACHE_FILE.read_text())
+        if cached["key"] == key and time.time() - cached["ts"] < MODELS_CACHE_TTL:
+            return cached["models"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    models = json.loads(_local_http_get(scheme, port, "/api/models", timeout=2)).get("models", [])
+    try:
+        MODELS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        MODELS_CACHE_FILE.write_text(json.dumps({"key": key, "models": models, "ts": time.time()}))
+    except OSError:
+        pass
+    return models
+
+
 def cmd_status():
     """Check what's running."""
     phoenix_pid = get_pid(PHOENIX_PID_FILE)
@@ -1000,9 +1488,11 @@ def cmd_status():
     print(f"  Database: {get_db_path()}")
     print()
 
+    # Probed once and reused for the models request below.
+    scheme = _probe_phoenix_scheme(default_phoenix) if phoenix_pid else None
     if phoenix_pid:
         print(f"Phoenix: running (PID {phoenix_pid})")
-        if scheme := _probe_phoenix_scheme(default_phoenix):
+        if scheme:
             print(f"  URL: {scheme}://localhost:{default_phoenix}")
     else:
         print("Phoenix: stopped")
@@ -1012,20 +1502,10 @@ def cmd_status():
     else:
         print("Vite:    stopped")
 
-    if phoenix_pid:
+    if scheme:
         try:
-            import ssl
-            import urllib.request
-
-            scheme = _probe_phoenix_scheme(default_phoenix) or "http"
-            context = ssl._create_unverified_context() if scheme == "https" else None
-            with urllib.request.urlopen(
-                f"{scheme}://localhost:{default_phoenix}/api/models",
-                timeout=2,
-                context=context,
-            ) as resp:
-                data = json.loads(resp.read())
-                print(f"Models:  {', '.join(data.get('models', []))}")
+            models = _phoenix_models(scheme, default_phoenix, phoenix_pid)
+            print(f"Models:  {', '.join(models)}")
         except Exception:
             pass
 
@@ -1264,7 +1744,7 @@ def cmd_check():
             run_step("cargo check musl", ["cargo", "check"])
         has_nextest = subprocess.run(
             ["cargo", "nextest", "--version"],
-            capture_output=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
         ).returncode == 0
         # nextest defaults to available_parallelism (= num_cpus). On low-RAM
         # boxes, num_cpus parallel test threads can swap and stall sensitive
@@ -1577,6 +2057,7 @@ def cmd_tasks_fix() -> bool:
 
 
 
+@functools.cache
 def detect_prod_env() -> str:
     """Detect production environment: 'launchd', 'native', or 'daemon'.
 
@@ -1603,6 +2084,7 @@ def detect_prod_env() -> str:
 PROD_BUILD_WORKTREE = ROOT.parent / ".phoenix-ide-build"
 
 
+@functools.cache
 def check_systemd_available() -> bool:
     """Check if systemd is available as the init system."""
     try:
@@ -1616,11 +2098,51 @@ def check_systemd_available() -> bool:
         return False
 
 
-def prod_build(version: str | None = None, strip: bool = True, target: str | None = "x86_64-unknown-linux-musl") -> Path:
+def _as_root(args: list[str]) -> list[str]:
+    """Prefix `args` with sudo, unless we're already root (e.g. `sudo ./dev.py`)."""
+    return args if os.geteuid() == 0 else ["sudo", *args]
+
+
+def systemctl_show(units: list[str], props: list[str]) -> dict[str, dict[str, str]]:
+    """Read `props` for several units with one `systemctl show`.
+
+    systemctl prints one blank-line-separated block of KEY=value lines per
+    unit, in argument order. Units that can't be queried map to {}.
+    """
+    args = ["systemctl", "show", *(f"--property={p}" for p in props), *units]
+    result = subprocess.run(args, capture_output=True, text=True)
+    blocks = result.stdout.strip().split("\n\n") if result.stdout.strip() else []
+    info: dict[str, dict[str, str]] = {}
+    for unit, block in zip(units, blocks):
+        info[unit] = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+    for unit in units:
+        info.setdefault(unit, {})
+    return info
+
+
+def _wait_active(unit: str, timeout: float = 5.0) -> str:
+    """Poll `systemctl is-active` until `unit` is active or failed.
+
+    Returns the last state seen ("active", "failed", or whatever it was
+    stuck in at the deadline), so callers move on as soon as systemd settles
+    instead of sleeping a fixed interval.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        state = subprocess.run(
+            ["systemctl", "is-active", unit], capture_output=True, text=True,
+        ).stdout.strip()
+        if state in ("active", "failed") or time.monotonic() >= deadline:
+            return state
+        time.sleep(0.05)
+
+
+def prod_build(version: str | None = None, strip: bool = True, target: str | None = "x86_64-unknown-linux-musl") -> tuple[Path, str]:
     """Build a production binary from a git tag or HEAD.
 
     Uses a separate git worktree to avoid disturbing the main working directory.
-    Returns path to the built binary.
+    Returns (path to the built binary, version label): the tag itself, or
+    `dev-<sha8>` for HEAD builds.
 
     Args:
         version: Git tag or None for HEAD
@@ -1629,23 +2151,28 @@ def prod_build(version: str | None = None, strip: bool = True, target: str | Non
     """
     # Determine what to build
     if version:
-        # Check if tag exists
-        result = subprocess.run(
-            ["git", "rev-parse", f"refs/tags/{version}"],
-            cwd=ROOT, capture_output=True
-        )
+        # Check if tag exists, resolving it to the commit it points at
+        resolve = ["git", "rev-parse", "--verify", "--quiet", f"refs/tags/{version}^{{commit}}"]
+        result = subprocess.run(resolve, cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            # Not here yet (e.g. a tag CI just pushed): fetch just that tag.
+            # In a partial clone this brings only the commits and trees it
+            # needs; blobs arrive on checkout.
+            print(f"Tag '{version}' not found locally, fetching from origin...")
+            subprocess.run(
+                ["git", "fetch", "--no-tags", "origin", f"refs/tags/{version}:refs/tags/{version}"],
+                cwd=ROOT, stdout=subprocess.DEVNULL,
+            )
+            result = subprocess.run(resolve, cwd=ROOT, capture_output=True, text=True)
         if result.returncode != 0:
             print(f"Tag '{version}' not found", file=sys.stderr)
             sys.exit(1)
         ref = version
+        commit = result.stdout.strip()
         print(f"Building from tag: {version}")
     else:
         # Use current HEAD commit
-        result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=ROOT, capture_output=True, text=True
-        )
-        commit = result.stdout.strip()
+        commit = _git_head()
         version = f"dev-{commit[:8]}"
         ref = commit
         # Warn if there are uncommitted changes — they won't be included in the build.
@@ -1666,8 +2193,20 @@ def prod_build(version: str | None = None, strip: bool = True, target: str | Non
     worktree = PROD_BUILD_WORKTREE
     
     if worktree.exists():
-        print(f"Updating build worktree to {ref}...")
-        subprocess.run(["git", "checkout", "--force", ref], cwd=worktree, check=True, capture_output=True)
+        try:
+            current = _read_git_head(worktree)
+        except OSError:
+            current = None
+        # Already at the right commit with no stray edits to tracked files:
+        # skip the checkout and its rewrite of the working tree.
+        clean = current == commit and subprocess.run(
+            ["git", "diff", "--quiet", "HEAD"], cwd=worktree, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ).returncode == 0
+        if clean:
+            print(f"Build worktree already at {ref}")
+        else:
+            print(f"Updating build worktree to {ref}...")
+            subprocess.run(["git", "checkout", "--force", ref], cwd=worktree, check=True, capture_output=True)
     else:
         # Create new worktree
         print(f"Creating build worktree at {worktree}...")
@@ -1677,24 +2216,51 @@ def prod_build(version: str | None = None, strip: bool = True, target: str | Non
         )
     
     ui_dir = worktree / "ui"
-    
-    # Build UI
-    npm_env = node_env()
-    print("Installing UI dependencies...")
-    result = subprocess.run(["npm", "ci"], cwd=ui_dir, capture_output=True, text=True, env=npm_env)
-    if result.returncode != 0:
-        print(result.stdout, end="")
-        print(result.stderr, file=sys.stderr, end="")
-        raise SystemExit(f"npm ci failed (exit {result.returncode})")
-
-    print("Building UI...")
-    subprocess.run(["npm", "run", "build"], cwd=ui_dir, check=True, env=npm_env)
-    
-    # Build Rust
-    build_env = os.environ.copy()
     needs_cross = target and sys.platform != "linux"
     if needs_cross:
         raise SystemExit(f"Cross-compilation not supported on {sys.platform}; use CI for release builds.")
+
+    # The Rust build can't overlap the UI build: RustEmbed bakes ui/dist into
+    # the binary at compile time. Downloading crates doesn't depend on it, so
+    # fetch them in the background while npm runs. A failed fetch is ignored
+    # here; cargo build retries it and reports the error itself.
+    fetch_cmd = ["cargo", "fetch"] + (["--target", target] if target else [])
+    fetch = subprocess.Popen(fetch_cmd, cwd=worktree, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # Build UI
+        npm_env = node_env()
+        print("Installing UI dependencies...")
+        # Tarballs come from npm's shared cache (~/.npm) when present;
+        # audit/fund are registry round-trips with nothing to act on here.
+        result = subprocess.run(
+            ["npm", "ci", "--prefer-offline", "--no-audit", "--no-fund"],
+            cwd=ui_dir, capture_output=True, text=True, env=npm_env,
+        )
+        if result.returncode != 0:
+            print(result.stdout, end="")
+            print(result.stderr, file=sys.stderr, end="")
+            raise SystemExit(f"npm ci failed (exit {result.returncode})")
+
+        print("Building UI...")
+        subprocess.run(["npm", "run", "build"], cwd=ui_dir, check=True, env=npm_env)
+    except BaseException:
+        fetch.kill()
+        raise
+    finally:
+        fetch.wait()
+
+    # Build Rust
+    build_env = os.environ.copy()
+    if strip:
+        # Let rustc strip at link time instead of rewriting the binary with
+        # a separate `strip` pass. The release profile keeps `debug = true`
+        # for local release builds; this only affects prod builds.
+        build_env["CARGO_PROFILE_RELEASE_STRIP"] = "symbols"
+    # Share compiled dependencies across refs via sccache when it's installed
+    # and the user hasn't configured a wrapper of their own.
+    if "RUSTC_WRAPPER" not in build_env and shutil.which("sccache"):
+        build_env["RUSTC_WRAPPER"] = "sccache"
+        print("Using sccache for the Rust build")
     cargo_cmd = ["cargo", "build", "--release"]
     if target:
         print(f"Building Rust ({target}, release)...")
@@ -1705,17 +2271,13 @@ def prod_build(version: str | None = None, strip: bool = True, target: str | Non
         binary = worktree / "target" / "release" / "phoenix_ide"
     subprocess.run(cargo_cmd, cwd=worktree, check=True, env=build_env)
 
-    # Strip the binary (unless debugging)
-    if strip:
-        print("Stripping binary...")
-        subprocess.run(["strip", str(binary)], check=True)
-    else:
+    if not strip:
         print("Keeping debug symbols (unstripped)...")
 
     size_mb = binary.stat().st_size / (1024 * 1024)
     print(f"Built: {binary} ({size_mb:.1f} MB)")
 
-    return binary
+    return binary, version
 
 
 # =============================================================================
@@ -1773,19 +2335,16 @@ NATIVE_SYSTEMD_CONFIG = SystemdConfig(
 
 
 
-def generate_systemd_socket(config: SystemdConfig) -> str:
-    """Generate systemd socket unit file content.
-    
-    The socket unit owns the listening socket and keeps it open during
-    service restarts, enabling zero-downtime upgrades.
-    """
-    return f"""[Unit]
+# Unit file templates. Only a handful of values vary per deploy; keeping the
+# text in one place makes the generated output easy to diff against what's
+# installed (see native_prod_deploy).
+_SYSTEMD_SOCKET_TMPL = """[Unit]
 Description=Phoenix IDE Socket
 Documentation=https://github.com/phoenix-ide/phoenix-ide
 
 [Socket]
 # Production port - socket stays open during service restarts
-ListenStream={config.port}
+ListenStream={port}
 # Disable Nagle's algorithm for lower latency (SSE, interactive)
 NoDelay=true
 # Allow connections to queue during restart
@@ -1795,18 +2354,68 @@ Backlog=128
 WantedBy=sockets.target
 """
 
+_SYSTEMD_SERVICE_TMPL = """[Unit]
+Description=Phoenix IDE
+Documentation=https://github.com/phoenix-ide/phoenix-ide
+# Socket must be ready before service starts
+Requires=phoenix-ide.socket
+After=network.target phoenix-ide.socket
+
+[Service]
+Type=simple
+User={user}
+{env_section}
+ExecStart={install_dir}/phoenix-ide
+# SIGHUP triggers graceful shutdown; systemd restarts with same socket.
+# `+` prefix runs ExecReload as root, ignoring User= -- otherwise a deploy
+# that crosses a User= boundary leaves scottopell trying to signal a
+# phoenix-dev process and silently fails with EPERM.
+ExecReload=+/bin/kill -HUP $MAINPID
+# Restart always (including after SIGHUP which exits 0)
+Restart=always
+RestartSec=1
+# Give connections time to drain during graceful shutdown
+TimeoutStopSec=30
+
+[Install]
+WantedBy=multi-user.target
+"""
+
+
+def generate_systemd_socket(config: SystemdConfig) -> str:
+    """Generate systemd socket unit file content.
+    
+    The socket unit owns the listening socket and keeps it open during
+    service restarts, enabling zero-downtime upgrades.
+    """
+    return _SYSTEMD_SOCKET_TMPL.format_map(dataclasses.asdict(config))
+
+
+def _sh_write_file(path: Path | str, content: str) -> str:
+    """Shell command that writes `content` verbatim to `path`."""
+    return f"printf '%s' {shlex.quote(content)} > {shlex.quote(str(path))}"
+
+
+def _run_sudo_script(script: str) -> int:
+    """Run a multi-step shell script as root under a single sudo.
+
+    `set -e` stops at the first failing step, mirroring the check=True
+    subprocess calls this replaces. Returns the script's exit status.
+    """
+    return subprocess.run(_as_root(["sh", "-s"]), input="set -e\n" + script, text=True).returncode
+
 
-def _install_prod_env_file(env: dict[str, str], service_user: str) -> str | None:
-    """Install /etc/phoenix-ide/phoenix.env from a parsed env dict.
+def _prod_env_file_script(env: dict[str, str], service_user: str) -> tuple[str, str | None]:
+    """Shell steps that install /etc/phoenix-ide/phoenix.env from a parsed env dict.
 
     Mode 0640 root:<service_user> -- readable by the service unit, not world-readable
-    (matters once the file holds API keys). Returns the installed path, or None if
-    `env` was empty (in which case any stale file is removed).
+    (matters once the file holds API keys). Returns the script fragment and the
+    installed path, or None if `env` was empty (in which case any stale file is removed).
     """
+    path = shlex.quote(str(PROD_ENV_FILE))
     if not env:
         # Best-effort cleanup of stale config from an earlier deploy.
-        subprocess.run(["sudo", "rm", "-f", str(PROD_ENV_FILE)], check=False)
-        return None
+        return f"rm -f {path}\n", None
 
     # Re-escape embedded newlines (e.g. LLM_CUSTOM_HEADERS) so each line is a
     # single KEY=value pair. The Rust loader unescapes `\n` itself.
@@ -1814,18 +2423,14 @@ def _install_prod_env_file(env: dict[str, str], service_user: str) -> str | None
     lines = [f"{k}={v.replace(chr(10), escaped_newline)}" for k, v in env.items()]
     content = "\n".join(lines) + "\n"
 
-    subprocess.run(["sudo", "mkdir", "-p", str(PROD_ENV_FILE.parent)], check=True)
-    proc = subprocess.run(
-        ["sudo", "tee", str(PROD_ENV_FILE)],
-        input=content.encode(),
-        capture_output=True,
+    # Created under umask 077 so the secrets are never briefly world-readable.
+    script = (
+        f"mkdir -p {shlex.quote(str(PROD_ENV_FILE.parent))}\n"
+        f"(umask 077; {_sh_write_file(PROD_ENV_FILE, content)})\n"
+        f"chown root:{shlex.quote(service_user)} {path}\n"
+        f"chmod 0640 {path}\n"
     )
-    if proc.returncode != 0:
-        print(f"Failed to write prod env file: {proc.stderr.decode()}", file=sys.stderr)
-        sys.exit(1)
-    subprocess.run(["sudo", "chown", f"root:{service_user}", str(PROD_ENV_FILE)], check=True)
-    subprocess.run(["sudo", "chmod", "0640", str(PROD_ENV_FILE)], check=True)
-    return str(PROD_ENV_FILE)
+    return script, str(PROD_ENV_FILE)
 
 
 def generate_systemd_service(config: SystemdConfig, version: str) -> str:
@@ -1853,32 +2458,9 @@ def generate_systemd_service(config: SystemdConfig, version: str) -> str:
 
     env_section = "\n".join(env_lines)
 
-    return f"""[Unit]
-Description=Phoenix IDE
-Documentation=https://github.com/phoenix-ide/phoenix-ide
-# Socket must be ready before service starts
-Requires=phoenix-ide.socket
-After=network.target phoenix-ide.socket
-
-[Service]
-Type=simple
-User={config.user}
-{env_section}
-ExecStart={config.install_dir}/phoenix-ide
-# SIGHUP triggers graceful shutdown; systemd restarts with same socket.
-# `+` prefix runs ExecReload as root, ignoring User= -- otherwise a deploy
-# that crosses a User= boundary leaves scottopell trying to signal a
-# phoenix-dev process and silently fails with EPERM.
-ExecReload=+/bin/kill -HUP $MAINPID
-# Restart always (including after SIGHUP which exits 0)
-Restart=always
-RestartSec=1
-# Give connections time to drain during graceful shutdown
-TimeoutStopSec=30
-
-[Install]
-WantedBy=multi-user.target
-"""
+    return _SYSTEMD_SERVICE_TMPL.format_map(
+        {**dataclasses.asdict(config), "env_section": env_section}
+    )
 
 
 def native_prod_deploy(version: str | None = None):
@@ -1895,26 +2477,10 @@ def native_prod_deploy(version: str | None = None):
         sys.exit(1)
 
     # Build
-    binary = prod_build(version)
-    
-    # Determine version string for display
-    if version is None:
-        result = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
-            cwd=ROOT, capture_output=True, text=True
-        )
-        version = f"dev-{result.stdout.strip()}"
-    
-    # Create install directory (service keeps running - we'll reload after copy)
-    print(f"Installing to {PROD_INSTALL_DIR}...")
-    subprocess.run(["sudo", "mkdir", "-p", str(PROD_INSTALL_DIR)], check=True)
-    
-    # Copy binary (remove first to handle "text file busy" when process is running)
+    binary, version = prod_build(version)
+
     dest = PROD_INSTALL_DIR / "phoenix-ide"
-    subprocess.run(["sudo", "rm", "-f", str(dest)], check=True)
-    subprocess.run(["sudo", "cp", str(binary), str(dest)], check=True)
-    subprocess.run(["sudo", "chmod", "+x", str(dest)], check=True)
-    
+
     # Detect service user first so we can set up the DB directory correctly
     service_user = detect_service_user()
 
@@ -1923,10 +2489,6 @@ def native_prod_deploy(version: str | None = None):
     # standard Linux convention.  (~/.phoenix-ide is only used for dev/daemon mode.)
     native_db_dir = Path("/var/lib/phoenix-ide")
     native_db_path = native_db_dir / "prod.db"
-    subprocess.run(["sudo", "mkdir", "-p", str(native_db_dir)], check=True)
-    # `-R` so an existing prod.db (and its sqlite -shm/-wal sidecars) created
-    # under a previous service_user are migrated to the current one.
-    subprocess.run(["sudo", "chown", "-R", f"{service_user}:{service_user}", str(native_db_dir)], check=True)
 
     # Load .phoenix-ide.env overrides (LLM_API_KEY_HELPER, OPENAI_USE_CODEX_AUTH, etc.)
     env_overrides: dict[str, str] = {}
@@ -1938,11 +2500,9 @@ def native_prod_deploy(version: str | None = None):
     if env_overrides.get("LLM_API_KEY_HELPER") or env_overrides.get("LLM_GATEWAY"):
         gateway = None
     else:
-        gateway = get_llm_gateway()
+        gateway = get_llm_gateway(use_cache=False)
 
-    env_file_path = _install_prod_env_file(env_overrides, service_user)
-    if env_file_path:
-        print(f"  Installed prod env file: {env_file_path} (0640 root:{service_user})")
+    env_file_script, env_file_path = _prod_env_file_script(env_overrides, service_user)
 
     # Configure for native deployment.
     # OAuth token auth: the binary reads ~/.claude/.credentials.json per request.
@@ -1956,73 +2516,93 @@ def native_prod_deploy(version: str | None = None):
         home_dir=str(Path.home()),
         env_file_path=env_file_path,
     )
-
-    # Install systemd socket unit (for socket activation)
-    print("Installing systemd socket unit...")
-    socket_content = generate_systemd_socket(config)
     socket_file = Path(f"/etc/systemd/system/{PROD_SERVICE_NAME}.socket")
-    
-    proc = subprocess.run(
-        ["sudo", "tee", str(socket_file)],
-        input=socket_content.encode(),
-        capture_output=True
-    )
-    if proc.returncode != 0:
-        print(f"Failed to write socket unit: {proc.stderr.decode()}", file=sys.stderr)
-        sys.exit(1)
-
-    # Install systemd service unit
-    print("Installing systemd service unit...")
-    unit_content = generate_systemd_service(config, version)
     unit_file = Path(f"/etc/systemd/system/{PROD_SERVICE_NAME}.service")
 
-    proc = subprocess.run(
-        ["sudo", "tee", str(unit_file)],
-        input=unit_content.encode(),
-        capture_output=True
-    )
-    if proc.returncode != 0:
-        print(f"Failed to write service unit: {proc.stderr.decode()}", file=sys.stderr)
-        sys.exit(1)
-    
-    # Reload systemd
-    subprocess.run(["sudo", "systemctl", "daemon-reload"], check=True)
-    
-    # Enable both socket and service
-    subprocess.run(["sudo", "systemctl", "enable", f"{PROD_SERVICE_NAME}.socket"], check=True)
-    subprocess.run(["sudo", "systemctl", "enable", PROD_SERVICE_NAME], check=True)
-    
-    # Check current state
-    socket_active = subprocess.run(
-        ["systemctl", "is-active", f"{PROD_SERVICE_NAME}.socket"],
-        capture_output=True, text=True
-    ).stdout.strip() == "active"
-    
+    # Check current state before touching anything. Only the service's state
+    # decides between a hot reload and a cold start.
     service_active = subprocess.run(
-        ["systemctl", "is-active", PROD_SERVICE_NAME],
-        capture_output=True, text=True
+        ["systemctl", "is-active", PROD_SERVICE_NAME], capture_output=True, text=True,
     ).stdout.strip() == "active"
-    
+    # Capture MainPID before reload so we can verify the process actually
+    # restarted. is-active alone isn't enough -- if ExecReload fails
+    # (e.g. EPERM signaling across a User= change), the OLD process keeps
+    # serving and the unit still reports active. The /version endpoint
+    # returns the cargo package version, so it can't distinguish either.
+    old_pid = subprocess.run(
+        ["systemctl", "show", PROD_SERVICE_NAME, "-p", "MainPID", "--value"],
+        capture_output=True, text=True,
+    ).stdout.strip() if service_active else ""
+
+    # Every privileged step runs in one `sudo sh -s` script, so deploy
+    # authenticates once instead of once per command.
+    q = shlex.quote
+    unit_names = f"{PROD_SERVICE_NAME}.socket {PROD_SERVICE_NAME}"
+    script = (
+        # Service keeps running while we swap the binary; we reload after.
+        f"mkdir -p {q(str(PROD_INSTALL_DIR))}\n"
+        # install(1) unlinks the old file before writing, which avoids "text
+        # file busy" while the old binary is still running.
+        f"install -m 0755 -o root -g root -T {q(str(binary))} {q(str(dest))}\n"
+        f"mkdir -p {q(str(native_db_dir))}\n"
+        # `-R` so an existing prod.db (and its sqlite -shm/-wal sidecars) created
+        # under a previous service_user are migrated to the current one.
+        f"chown -R {q(f'{service_user}:{service_user}')} {q(str(native_db_dir))}\n"
+        + env_file_script
+    )
+    # Socket unit (for socket activation) and service unit. Only rewrite
+    # units whose content changed, and skip daemon-reload when none did and
+    # systemd doesn't already want one -- a binary-only redeploy at the same
+    # version touches neither. NeedDaemonReload catches files that are
+    # current on disk but were never loaded: an earlier deploy that failed
+    # between writing and reloading, or a manual edit.
+    # /etc/systemd/system is world-readable, so no sudo is needed to compare.
+    loaded = systemctl_show([f"{PROD_SERVICE_NAME}.socket", PROD_SERVICE_NAME], ["NeedDaemonReload"])
+    units_changed = any(info.get("NeedDaemonReload") == "yes" for info in loaded.values())
+    for path, content in (
+        (socket_file, generate_systemd_socket(config)),
+        (unit_file, generate_systemd_service(config, version)),
+    ):
+        try:
+            unchanged = path.read_text() == content
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            script += _sh_write_file(path, content) + "\n"
+            units_changed = True
+    if units_changed:
+        script += "systemctl daemon-reload\n"
+    script += f"systemctl enable {unit_names}\n"
     if service_active:
         # Service running - send SIGHUP for hot reload
         # With socket activation, this triggers graceful shutdown -> systemd restart
+        script += f"systemctl reload {PROD_SERVICE_NAME}\n"
+    else:
+        # Stop any existing (non-socket-activated) service first, then start
+        # socket and service together; the socket-activated service is ordered
+        # after its socket within the same transaction.
+        script += f"systemctl stop {PROD_SERVICE_NAME} 2>/dev/null || true\n"
+        script += f"systemctl start {unit_names}\n"
+
+    print(f"Installing to {PROD_INSTALL_DIR} and updating systemd units...")
+    if service_active:
         print("Sending reload signal (SIGHUP) for zero-downtime upgrade...")
-        # Capture MainPID before reload so we can verify the process actually
-        # restarted. is-active alone isn't enough -- if ExecReload fails
-        # (e.g. EPERM signaling across a User= change), the OLD process keeps
-        # serving and the unit still reports active. The /version endpoint
-        # returns the cargo package version, so it can't distinguish either.
-        old_pid = subprocess.run(
-            ["systemctl", "show", PROD_SERVICE_NAME, "-p", "MainPID", "--value"],
-            capture_output=True, text=True,
-        ).stdout.strip()
-        subprocess.run(["sudo", "systemctl", "reload", PROD_SERVICE_NAME], check=True)
+    else:
+        print("Starting socket and service...")
+    if _run_sudo_script(script) != 0:
+        print("\n✗ Deploy failed while installing (see errors above)", file=sys.stderr)
+        sys.exit(1)
+    if env_file_path:
+        print(f"  Installed prod env file: {env_file_path} (0640 root:{service_user})")
 
+    if service_active:
         # Poll for new PID. SIGHUP graceful exit + Restart=always cycles the
-        # process; the new MainPID should appear within a few seconds.
+        # process; the new MainPID usually appears within RestartSec (1s) plus
+        # drain time. Poll finely so we move on as soon as it does.
         new_pid = old_pid
-        for _ in range(15):
-            time.sleep(1)
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            time.sleep(0.1)
             new_pid = subprocess.run(
                 ["systemctl", "show", PROD_SERVICE_NAME, "-p", "MainPID", "--value"],
                 capture_output=True, text=True,
@@ -2043,11 +2623,7 @@ def native_prod_deploy(version: str | None = None):
             sys.exit(1)
 
         # Verify it came back up
-        result = subprocess.run(
-            ["systemctl", "is-active", PROD_SERVICE_NAME],
-            capture_output=True, text=True
-        )
-        if result.stdout.strip() == "active":
+        if _wait_active(PROD_SERVICE_NAME) == "active":
             write_deployed_sha()
             print(f"\n✓ Deployed {version} to production (zero-downtime upgrade)")
             print(f"  Service: {PROD_SERVICE_NAME}")
@@ -2058,23 +2634,13 @@ def native_prod_deploy(version: str | None = None):
         else:
             print(f"\n⚠ Service restarting... check status with: systemctl status {PROD_SERVICE_NAME}")
     else:
-        # Service not running - start socket first, then service
-        print("Starting socket and service...")
-
-        # Stop any existing (non-socket-activated) service first
-        subprocess.run(["sudo", "systemctl", "stop", PROD_SERVICE_NAME], capture_output=True)
-
-        # Start the socket (service will be started on first connection or explicitly)
-        subprocess.run(["sudo", "systemctl", "start", f"{PROD_SERVICE_NAME}.socket"], check=True)
-        subprocess.run(["sudo", "systemctl", "start", PROD_SERVICE_NAME], check=True)
-        time.sleep(1)
-
         # Verify it started
-        result = subprocess.run(
-            ["systemctl", "is-active", PROD_SERVICE_NAME],
-            capture_output=True, text=True
-        )
-        if result.stdout.strip() == "active":
+        if _wait_active(PROD_SERVICE_NAME) == "active":
+            # A simple service is "active" as soon as it's exec'd; a slow
+            # first start (e.g. migrations) isn't a failed deploy, so a
+            # silent /version only warns, as in the launchd/daemon paths.
+            if _wait_prod_health(timeout=10) is None:
+                print("WARNING: Server started but health check failed after 10s", file=sys.stderr)
             write_deployed_sha()
             print(f"\n✓ Deployed {version} to production")
             print(f"  Service: {PROD_SERVICE_NAME}")
@@ -2084,7 +2650,7 @@ def native_prod_deploy(version: str | None = None):
             print(f"  URL: {_prod_display_url()}")
         else:
             print(f"\n✗ Service failed to start", file=sys.stderr)
-            subprocess.run(["sudo", "journalctl", "-u", PROD_SERVICE_NAME, "-n", "20", "--no-pager"])
+            subprocess.run(_as_root(["journalctl", "-u", PROD_SERVICE_NAME, "-n", "20", "--no-pager"]))
             sys.exit(1)
 
 
@@ -2098,9 +2664,11 @@ def _load_env_file(env: dict[str, str], filename: str = ".phoenix-ide.env") -> s
     PHOENIX_PASSWORD by setting it to empty in the dev file).
     """
     env_file = ROOT / filename
-    if not env_file.exists():
+    try:
+        f = open(env_file)
+    except FileNotFoundError:
         return None
-    with open(env_file) as f:
+    with f:
         for line in f:
             line = line.strip()
             if not line or line.startswith("#"):
@@ -2129,7 +2697,7 @@ def _configure_llm_env(env: dict[str, str]) -> str:
         return "direct API key (ANTHROPIC_API_KEY)"
 
     # Auto-detect exe.dev gateway
-    gateway = get_llm_gateway()
+    gateway = get_llm_gateway(use_cache=False)
     if gateway:
         env["LLM_GATEWAY"] = gateway
         return f"gateway ({gateway}) [auto-detected]"
@@ -2162,19 +2730,55 @@ def _prod_display_url(env: dict[str, str] | None = None) -> str:
     return f"{scheme}://localhost:{PROD_PORT}"
 
 
-def _prod_local_health_url(env: dict[str, str] | None = None) -> str:
-    env = env or _repo_env()
-    scheme = "https" if tls_enabled_from_env(env) else "http"
-    return f"{scheme}://localhost:{PROD_PORT}/version"
+def _prod_health_connection(env: dict[str, str], timeout: float):
+    return _local_http_connection(PROD_PORT, tls_enabled_from_env(env), timeout)
 
 
-def _open_prod_health(env: dict[str, str] | None = None, timeout: float = 5.0):
-    import ssl
-    import urllib.request
+def _prod_health_get(conn) -> str:
+    conn.request("GET", "/version")
+    resp = conn.getresponse()
+    body = resp.read().decode().strip()
+    if resp.status >= 400:
+        raise OSError(f"HTTP {resp.status} from /version")
+    return body
 
-    env = env or _repo_env()
-    context = ssl._create_unverified_context() if tls_enabled_from_env(env) else None
-    return urllib.request.urlopen(_prod_local_health_url(env), timeout=timeout, context=context)
+
+def _prod_health(env: dict[str, str] | None = None, timeout: float = 5.0) -> str:
+    """GET the prod /version endpoint once. Raises on any failure."""
+    conn = _prod_health_connection(env or _repo_env(), timeout)
+    try:
+        return _prod_health_get(conn)
+    finally:
+        conn.close()
+
+
+def _wait_prod_health(
+    env: dict[str, str] | None = None,
+    timeout: float = 10.0,
+    proc: subprocess.Popen | None = None,
+) -> str | None:
+    """Poll /version until prod answers; return its body, or None on timeout.
+
+    Retries with exponential backoff (10ms doubling, capped at 500ms) over a
+    single HTTPConnection, which reconnects itself after a refused attempt,
+    so a fast start is seen within milliseconds. Gives up early if `proc`
+    exits.
+    """
+    conn = _prod_health_connection(env or _repo_env(), timeout=2)
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    try:
+        while True:
+            try:
+                return _prod_health_get(conn)
+            except Exception:
+                conn.close()
+            if (proc is not None and proc.poll() is not None) or time.monotonic() >= deadline:
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+    finally:
+        conn.close()
 
 
 def prod_daemon_deploy():
@@ -2184,7 +2788,7 @@ def prod_daemon_deploy():
     Daemonizes the process and returns to shell immediately.
     """
     # Build binary (keep debug symbols for debugging)
-    binary = prod_build(version=None, strip=False)
+    binary, _ = prod_build(version=None, strip=False)
 
     # Set up environment
     env = os.environ.copy()
@@ -2215,8 +2819,9 @@ def prod_daemon_deploy():
         try:
             with open(prod_pid_path) as f:
                 old_pid = int(f.read().strip())
-            os.kill(old_pid, 15)  # SIGTERM
-            time.sleep(1)
+            os.kill(old_pid, signal.SIGTERM)
+            # Wait for it to release the port (up to the old fixed 1s)
+            _wait_for_exit(old_pid, 1.0)
         except (ProcessLookupError, ValueError):
             pass  # Process already dead or invalid PID
         prod_pid_path.unlink(missing_ok=True)
@@ -2235,22 +2840,15 @@ def prod_daemon_deploy():
     with open(prod_pid_path, "w") as f:
         f.write(str(proc.pid))
 
-    # Verify startup
-    time.sleep(2)
+    # Verify startup: wait for the health endpoint, bailing out if it exits
+    version_text = _wait_prod_health(env, timeout=10, proc=proc)
     if proc.poll() is not None:
         print("ERROR: Server failed to start. Check logs:", file=sys.stderr)
         print(f"  {prod_log_path}", file=sys.stderr)
         sys.exit(1)
-
-    # Health check
-    try:
-        import urllib.request
-        with _open_prod_health(env, timeout=5) as resp:
-            version_text = resp.read().decode().strip()
-            version_info = {"version": version_text}
-    except Exception as e:
-        print(f"WARNING: Server started but health check failed: {e}", file=sys.stderr)
-        version_info = {"version": "unknown"}
+    if version_text is None:
+        print("WARNING: Server started but health check failed after 10s", file=sys.stderr)
+    version_info = {"version": version_text or "unknown"}
 
     write_deployed_sha()
     print(f"\n✓ Deployed daemon to production")
@@ -2286,8 +2884,7 @@ def prod_daemon_status():
 
         # Health check
         try:
-            import urllib.request
-            _open_prod_health(timeout=2).close()
+            _prod_health(timeout=2)
             print(f"  Health: OK")
         except Exception as e:
             print(f"  Health: Unreachable ({type(e).__name__}: {e})")
@@ -2319,18 +2916,12 @@ def prod_daemon_stop():
             pid = int(f.read().strip())
 
         print(f"Stopping daemon (PID {pid})...")
-        os.kill(pid, 15)  # SIGTERM
+        os.kill(pid, signal.SIGTERM)
 
-        # Wait for graceful shutdown
-        for _ in range(10):
-            time.sleep(0.5)
-            try:
-                os.kill(pid, 0)
-            except ProcessLookupError:
-                break
-        else:
+        # Wait for graceful shutdown (returns the moment the process exits)
+        if not _wait_for_exit(pid, 5.0):
             print("Graceful shutdown timed out, forcing...")
-            os.kill(pid, 9)  # SIGKILL
+            os.kill(pid, signal.SIGKILL)
 
         prod_pid_path.unlink(missing_ok=True)
         print("✓ Stopped")
@@ -2347,8 +2938,13 @@ def get_systemd_override_dir() -> Path:
     return Path(f"/etc/systemd/system/{PROD_SERVICE_NAME}.service.d")
 
 
-def list_systemd_overrides() -> list[tuple[str, str]]:
-    """List all systemd drop-in overrides. Returns [(filename, content), ...]."""
+def list_systemd_overrides() -> list[tuple[str, list[str]]]:
+    """List all systemd drop-in overrides. Returns [(filename, [var names]), ...].
+
+    Only the variable names set by each file's `Environment=` lines are
+    returned, never their values: overrides are where API keys and tokens
+    go, and this feeds `prod status` output.
+    """
     override_dir = get_systemd_override_dir()
     if not override_dir.exists():
         return []
@@ -2356,10 +2952,15 @@ def list_systemd_overrides() -> list[tuple[str, str]]:
     overrides = []
     for conf in sorted(override_dir.glob("*.conf")):
         try:
-            content = conf.read_text().strip()
-            overrides.append((conf.name, content))
+            names = [
+                assignment.partition("=")[0]
+                for line in conf.read_text().splitlines()
+                if line.startswith("Environment=")
+                for assignment in shlex.split(line.removeprefix("Environment="))
+            ]
+            overrides.append((conf.name, names))
         except Exception:
-            overrides.append((conf.name, "<unreadable>"))
+            overrides.append((conf.name, ["<unreadable>"]))
     return overrides
 
 
@@ -2368,35 +2969,35 @@ def native_prod_override_set(name: str, value: str):
     override_dir = get_systemd_override_dir()
     conf_file = override_dir / f"{name}.conf"
     content = f"[Service]\nEnvironment={name}={value}\n"
-    
-    subprocess.run(["sudo", "mkdir", "-p", str(override_dir)], check=True)
-    
+
     # Remove any existing conf files that set the same variable
     # (prevents conflicts from differently-named files)
+    conflicts = []
     if override_dir.exists():
         for existing in override_dir.glob("*.conf"):
             if existing.name == f"{name}.conf":
                 continue  # Will be overwritten anyway
             try:
-                existing_content = existing.read_text()
-                if f"Environment={name}=" in existing_content:
-                    subprocess.run(["sudo", "rm", str(existing)], check=True)
-                    print(f"  Removed conflicting override: {existing.name}")
+                if f"Environment={name}=" in existing.read_text():
+                    conflicts.append(existing)
             except Exception:
                 pass
-    
-    # Write via sudo tee
-    proc = subprocess.run(
-        ["sudo", "tee", str(conf_file)],
-        input=content.encode(),
-        capture_output=True
-    )
-    if proc.returncode != 0:
+
+    # Write, reload and restart under a single sudo. The conf is written to a
+    # temp name and renamed into place, so a crash mid-write never leaves
+    # systemd a truncated drop-in.
+    tmp_file = override_dir / f".{name}.conf.tmp"
+    script = f"mkdir -p {shlex.quote(str(override_dir))}\n"
+    if conflicts:
+        script += f"rm -f {' '.join(shlex.quote(str(p)) for p in conflicts)}\n"
+    script += _sh_write_file(tmp_file, content) + "\n"
+    script += f"mv -f {shlex.quote(str(tmp_file))} {shlex.quote(str(conf_file))}\n"
+    script += f"systemctl daemon-reload\nsystemctl restart {PROD_SERVICE_NAME}\n"
+    if _run_sudo_script(script) != 0:
         print(f"ERROR: Failed to write {conf_file}", file=sys.stderr)
         sys.exit(1)
-    
-    subprocess.run(["sudo", "systemctl", "daemon-reload"], check=True)
-    subprocess.run(["sudo", "systemctl", "restart", PROD_SERVICE_NAME], check=True)
+    for existing in conflicts:
+        print(f"  Removed conflicting override: {existing.name}")
     print(f"✓ Set {name}={value}")
     print(f"  Service restarted")
 
@@ -2410,31 +3011,40 @@ def native_prod_override_unset(name: str):
         print(f"No override '{name}' found")
         return
     
-    subprocess.run(["sudo", "rm", str(conf_file)], check=True)
-    subprocess.run(["sudo", "systemctl", "daemon-reload"], check=True)
-    subprocess.run(["sudo", "systemctl", "restart", PROD_SERVICE_NAME], check=True)
+    script = (
+        f"rm {shlex.quote(str(conf_file))}\n"
+        f"systemctl daemon-reload\nsystemctl restart {PROD_SERVICE_NAME}\n"
+    )
+    if _run_sudo_script(script) != 0:
+        print(f"ERROR: Failed to remove {conf_file}", file=sys.stderr)
+        sys.exit(1)
     print(f"✓ Removed {name} override")
     print(f"  Service restarted")
 
 
 def native_prod_status():
     """Show production service status (native Linux)."""
-    # Check if service exists
-    result = subprocess.run(
-        ["systemctl", "is-active", PROD_SERVICE_NAME],
-        capture_output=True, text=True
+    socket_unit = f"{PROD_SERVICE_NAME}.socket"
+    units = systemctl_show(
+        [PROD_SERVICE_NAME, socket_unit], ["ActiveState", "SubState", "MainPID"],
     )
-    status = result.stdout.strip()
-    
+    service = units[PROD_SERVICE_NAME]
+    socket_info = units[socket_unit]
+    status = service.get("ActiveState", "unknown")
+
     if status == "active":
         print(f"Production: running")
+        if service.get("MainPID", "0") != "0":
+            print(f"  PID: {service['MainPID']}")
         print(f"  Port: {PROD_PORT}")
+        if socket_info.get("ActiveState"):
+            print(f"  Socket: {socket_info['ActiveState']} ({socket_info.get('SubState', '?')})")
         print(f"  URL: {_prod_display_url()}")
         print(f"  Database: {PROD_DB_PATH}")
 
         # Health check
         try:
-            _open_prod_health(timeout=2).close()
+            _prod_health(timeout=2)
             print(f"  Health: OK")
         except Exception:
             print(f"  Health: not responding")
@@ -2443,6 +3053,11 @@ def native_prod_status():
             print(f"  Commit: {sha}")
     else:
         print(f"Production: {status}")
+
+    if overrides := list_systemd_overrides():
+        print(f"  Overrides:")
+        for filename, names in overrides:
+            print(f"    {', '.join(names) or '<no Environment=>'}  ({filename})")
     
     # Show OAuth token status from credentials file (read directly by the binary).
     creds_path = Path.home() / ".claude" / ".credentials.json"
@@ -2470,7 +3085,7 @@ def native_prod_status():
 
 def native_prod_stop():
     """Stop production service (native Linux)."""
-    subprocess.run(["sudo", "systemctl", "stop", PROD_SERVICE_NAME])
+    subprocess.run(_as_root(["systemctl", "stop", PROD_SERVICE_NAME]))
     print(f"Stopped {PROD_SERVICE_NAME}")
 
 
@@ -2547,7 +3162,7 @@ def _launchd_stop_if_loaded():
     # Service is loaded — bootout stops and unloads it
     subprocess.run(
         ["launchctl", "bootout", f"gui/{uid}", str(LAUNCHD_PLIST_PATH)],
-        capture_output=True,  # Suppress output; may warn if already stopping
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,  # May warn if already stopping
     )
     # Brief wait for process to exit
     time.sleep(1)
@@ -2556,15 +3171,7 @@ def _launchd_stop_if_loaded():
 def launchd_prod_deploy(version: str | None = None):
     """Build and deploy to production via launchd (native macOS)."""
     # Build native macOS binary
-    binary = prod_build(version, target=None)
-
-    # Determine version string
-    if version is None:
-        result = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
-            cwd=ROOT, capture_output=True, text=True,
-        )
-        version = f"dev-{result.stdout.strip()}"
+    binary, version = prod_build(version, target=None)
 
     # Stop existing service
     _launchd_stop_if_loaded()
@@ -2594,7 +3201,7 @@ def launchd_prod_deploy(version: str | None = None):
     # Auto-detect gateway only if env file didn't provide LLM config
     gateway = None
     if not env_overrides.get("LLM_API_KEY_HELPER") and not env_overrides.get("LLM_GATEWAY"):
-        gateway = get_llm_gateway()
+        gateway = get_llm_gateway(use_cache=False)
 
     # Generate and write plist
     plist_content = generate_launchd_plist(version, gateway, env_overrides)
@@ -2612,17 +3219,9 @@ def launchd_prod_deploy(version: str | None = None):
         sys.exit(1)
 
     # Health check with retry (server may take a few seconds to bind the port)
-    health_version = None
-    for attempt in range(5):
-        time.sleep(2)
-        try:
-            with _open_prod_health(env_overrides, timeout=5) as resp:
-                health_version = resp.read().decode().strip()
-            break
-        except Exception:
-            if attempt < 4:
-                continue
-            print("WARNING: Server started but health check failed after 10s", file=sys.stderr)
+    health_version = _wait_prod_health(env_overrides, timeout=10)
+    if health_version is None:
+        print("WARNING: Server started but health check failed after 10s", file=sys.stderr)
 
     write_deployed_sha()
     if env_overrides.get("LLM_API_KEY_HELPER"):
@@ -2670,7 +3269,7 @@ def launchd_prod_status():
 
     # Health check
     try:
-        _open_prod_health(timeout=2).close()
+        _prod_health(timeout=2)
         print(f"  Health: OK")
     except Exception:
         print(f"  Health: not responding")
@@ -2712,7 +3311,7 @@ def launchd_prod_override_set(name: str, value: str):
     uid = os.getuid()
     subprocess.run(
         ["launchctl", "bootstrap", f"gui/{uid}", str(LAUNCHD_PLIST_PATH)],
-        capture_output=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
     )
     print(f"✓ Set {name}={value}")
     print(f"  Service reloaded")
@@ -2744,7 +3343,7 @@ def launchd_prod_override_unset(name: str):
     uid = os.getuid()
     subprocess.run(
         ["launchctl", "bootstrap", f"gui/{uid}", str(LAUNCHD_PLIST_PATH)],
-        capture_output=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
     )
     print(f"✓ Removed {name} override")
     print(f"  Service reloaded")
@@ -2761,11 +3360,60 @@ def cmd_prod_build(version: str | None = None):
         sys.exit(1)
 
 
-def cmd_prod_deploy(version: str | None = None):
-    """Build and deploy to production (auto-detects environment)."""
+CHECK_CACHE_FILE = DB_DIR / "last-check.tree"
+CHECK_CACHE_TTL = 24 * 3600  # seconds
+
+
+def _worktree_tree_hash() -> str | None:
+    """Git tree hash of the working tree as it is now, or None on failure.
+
+    Stages everything (tracked changes and untracked, non-ignored files) into
+    a throwaway copy of the index and writes it as a tree, so the real index
+    is untouched. Identical content always yields the same hash.
+    """
+    import tempfile
+
+    index = subprocess.run(
+        ["git", "rev-parse", "--path-format=absolute", "--git-path", "index"],
+        cwd=ROOT, capture_output=True, text=True,
+    ).stdout.strip()
+    with tempfile.TemporaryDirectory() as td:
+        tmp_index = Path(td) / "index"
+        try:
+            shutil.copyfile(index, tmp_index)
+        except OSError:
+            pass  # No index yet; git starts from an empty one
+        env = {**os.environ, "GIT_INDEX_FILE": str(tmp_index)}
+        if subprocess.run(["git", "add", "-A"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode != 0:
+            return None
+        result = subprocess.run(["git", "write-tree"], cwd=ROOT, env=env, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _run_predeploy_checks(force: bool = False) -> None:
+    """Run cmd_check, unless it already passed on identical source recently."""
+    tree = _worktree_tree_hash()
+    if not force and tree:
+        try:
+            cached = CHECK_CACHE_FILE.read_text().strip()
+            fresh = time.time() - CHECK_CACHE_FILE.stat().st_mtime < CHECK_CACHE_TTL
+        except OSError:
+            cached, fresh = "", False
+        if cached == tree and fresh:
+            print(f"Pre-deploy checks: cached pass for tree {tree[:12]} (--force-check to re-run)\n")
+            return
+
     print("Running pre-deploy checks...\n")
-    cmd_check()
+    cmd_check()  # exits on failure
     print()
+    if tree:
+        CHECK_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        CHECK_CACHE_FILE.write_text(tree + "\n")
+
+
+def cmd_prod_deploy(version: str | None = None, force_check: bool = False):
+    """Build and deploy to production (auto-detects environment)."""
+    _run_predeploy_checks(force=force_check)
 
     env = detect_prod_env()
 
@@ -2854,47 +3502,65 @@ def cmd_prod_override_unset(name: str):
 # =============================================================================
 
 def lima_shell_quiet(cmd: str, check=True) -> subprocess.CompletedProcess:
-    """Run a command inside the Lima VM, capturing output."""
+    """Run a command inside the Lima VM, capturing output.
+
+    Skips login-shell startup (profile, bashrc, rustup env) and just puts
+    rustup's cargo bin dir on PATH; node/npm come from dnf in /usr/bin.
+    Interactive `lima shell` still gets a normal login shell.
+    """
     return subprocess.run(
-        ["limactl", "shell", "--workdir", "/", LIMA_VM_NAME, "--", "bash", "-lc", cmd],
+        ["limactl", "shell", "--workdir", "/", LIMA_VM_NAME, "--",
+         "bash", "--noprofile", "--norc", "-c",
+         f'export PATH="$HOME/.cargo/bin:/usr/local/bin:$PATH"; {cmd}'],
         check=check, capture_output=True, text=True,
     )
 
 
-def lima_is_running() -> bool:
-    """Check if the Lima VM is running."""
+@functools.cache
+def _lima_list() -> dict[str, str]:
+    """Map of Lima VM name -> status from one `limactl list --json`.
+
+    Only our VM is listed: limactl filters by name itself, so other VMs are
+    never serialized or parsed. An unknown name gives empty output (or a
+    non-zero exit on older limactl), i.e. an empty map.
+
+    Cached for the rest of the invocation; call `_lima_list.cache_clear()`
+    after anything that changes VM state (start/create/delete).
+    """
     result = subprocess.run(
-        ["limactl", "list", "--json"],
-        capture_output=True, text=True,
+        ["limactl", "list", LIMA_VM_NAME, "--json"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
     )
     if result.returncode != 0:
-        return False
-    for line in result.stdout.strip().splitlines():
-        try:
-            vm = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if vm.get("name") == LIMA_VM_NAME and vm.get("status") == "Running":
-            return True
-    return False
+        return {}
+    # One JSON object per line. Join them into a single array and parse it in
+    # one call (json.loads takes the raw bytes directly); only if that fails
+    # fall back to line-by-line so one bad record doesn't hide the rest.
+    lines = [line for line in result.stdout.splitlines() if line.strip()]
+    try:
+        records = json.loads(b"[" + b",".join(lines) + b"]")
+    except ValueError:  # JSONDecodeError, or undecodable bytes
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return {
+        vm["name"]: vm.get("status", "")
+        for vm in records
+        if isinstance(vm, dict) and vm.get("name")
+    }
+
+
+def lima_is_running() -> bool:
+    """Check if the Lima VM is running."""
+    return _lima_list().get(LIMA_VM_NAME) == "Running"
 
 
 def lima_vm_exists() -> bool:
     """Check if the Lima VM exists (any status)."""
-    result = subprocess.run(
-        ["limactl", "list", "--json"],
-        capture_output=True, text=True,
-    )
-    if result.returncode != 0:
-        return False
-    for line in result.stdout.strip().splitlines():
-        try:
-            vm = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if vm.get("name") == LIMA_VM_NAME:
-            return True
-    return False
+    return LIMA_VM_NAME in _lima_list()
 
 
 def lima_ensure_running():
@@ -2906,12 +3572,13 @@ def lima_ensure_running():
         sys.exit(1)
     print("Starting Lima VM...")
     subprocess.run(["limactl", "start", LIMA_VM_NAME], check=True)
+    _lima_list.cache_clear()
 
 
 def cmd_lima_create():
     """Create and provision the Lima VM."""
     # Check limactl exists
-    result = subprocess.run(["limactl", "--version"], capture_output=True)
+    result = subprocess.run(["limactl", "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     if result.returncode != 0:
         print("limactl not found. Install Lima: brew install lima", file=sys.stderr)
         sys.exit(1)
@@ -2921,6 +3588,7 @@ def cmd_lima_create():
         if not lima_is_running():
             print("Starting VM...")
             subprocess.run(["limactl", "start", LIMA_VM_NAME], check=True)
+            _lima_list.cache_clear()
         print("VM is running.")
         return
 
@@ -2932,22 +3600,26 @@ def cmd_lima_create():
 
     print("Starting VM...")
     subprocess.run(["limactl", "start", LIMA_VM_NAME], check=True)
+    _lima_list.cache_clear()
 
     # Verify provisioning
     print("\nVerifying provisioning...")
-    result = lima_shell_quiet("rustc --version", check=False)
-    if result.returncode == 0:
-        print(f"  Rust: {result.stdout.strip()}")
+    # One VM round trip for all three probes; a missing tool yields an
+    # empty value rather than failing the whole command.
+    result = lima_shell_quiet(
+        "printf 'RUST=%s\\nKERNEL=%s\\nNODE=%s\\n'"
+        ' "$(rustc --version 2>/dev/null)" "$(uname -r)" "$(node --version 2>/dev/null)"',
+        check=False,
+    )
+    probes = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+    if probes.get("RUST"):
+        print(f"  Rust: {probes['RUST']}")
     else:
         print("  WARNING: Rust not found. Provisioning may have failed.", file=sys.stderr)
-
-    result = lima_shell_quiet("uname -r", check=False)
-    if result.returncode == 0:
-        print(f"  Kernel: {result.stdout.strip()}")
-
-    result = lima_shell_quiet("node --version", check=False)
-    if result.returncode == 0:
-        print(f"  Node: {result.stdout.strip()}")
+    if probes.get("KERNEL"):
+        print(f"  Kernel: {probes['KERNEL']}")
+    if probes.get("NODE"):
+        print(f"  Node: {probes['NODE']}")
 
     print(f"\nVM '{LIMA_VM_NAME}' is ready.")
 
@@ -2968,6 +3640,7 @@ def cmd_lima_destroy():
 
     print(f"Deleting VM '{LIMA_VM_NAME}'...")
     subprocess.run(["limactl", "delete", LIMA_VM_NAME, "--force"], check=True)
+    _lima_list.cache_clear()
     print("VM deleted.")
 
 
@@ -3032,6 +3705,10 @@ def main():
     build_parser.add_argument("version", nargs="?", help="Git tag (default: HEAD)")
     deploy_parser = prod_sub.add_parser("deploy", help="Build and deploy to production")
     deploy_parser.add_argument("version", nargs="?", help="Git tag (default: HEAD)")
+    deploy_parser.add_argument(
+        "--force-check", action="store_true",
+        help="Re-run pre-deploy checks even if they passed on identical source",
+    )
     prod_sub.add_parser("status", help="Show production status")
     prod_sub.add_parser("stop", help="Stop production service")
     # Override management
@@ -3093,7 +3770,7 @@ def main():
         if args.prod_command == "build":
             cmd_prod_build(args.version)
         elif args.prod_command == "deploy":
-            cmd_prod_deploy(args.version)
+            cmd_prod_deploy(args.version, force_check=args.force_check)
         elif args.prod_command == "status":
             cmd_prod_status()
         elif args.prod_command == "stop":